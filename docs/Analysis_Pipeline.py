@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+CACHE_DIR = '.analysis_cache'
+
+
+# === STAGES ===
+class Stage:
+    """One named step of an analysis (load, aggregate, fit, test, render or report).
+
+    `func` is called with the outputs of `deps` as positional arguments followed by
+    `params` as keyword arguments. `inputs` are files the stage reads and `helpers` are
+    extra functions whose source belongs to the stage's code; both feed its cache key.
+    Render stages return the list of files they wrote.
+    """
+
+    def __init__(self, name, func, deps=(), params=None, inputs=(), helpers=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.inputs = tuple(inputs)
+        self.helpers = tuple(helpers)
+
+    @property
+    def kind(self):
+        return self.name.rsplit('.', 1)[-1].split('_', 1)[0]
+
+    def key(self, dep_hashes):
+        """Content hash of the stage's code, parameters, input files and dependency outputs."""
+        h = hashlib.sha256()
+        for fn in (self.func,) + self.helpers:
+            h.update(inspect.getsource(fn).encode())
+        h.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+        for path in self.inputs:
+            with open(path, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        for dep_hash in dep_hashes:
+            h.update(dep_hash.encode())
+        return h.hexdigest()
+
+
+def _execute(func, args, params):
+    return func(*args, **params)
+
+
+# === CACHE ===
+class StageCache:
+    """Pickled stage outputs under <root>/<stage>/<key>.pkl, with a JSON sidecar holding the
+    hash of the output so downstream keys can be computed without unpickling it."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _path(self, stage, key, ext):
+        return os.path.join(self.root, stage.name, f'{key}.{ext}')
+
+    def lookup(self, stage, key):
+        """Return the cached output hash, or None on a miss (or when rendered files are gone)."""
+        try:
+            with open(self._path(stage, key, 'json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(os.path.exists(p) for p in meta.get('artifacts', [])):
+            return None
+        return meta['output_hash']
+
+    def load(self, stage, key):
+        with open(self._path(stage, key, 'pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, stage, key, output):
+        data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        output_hash = hashlib.sha256(data).hexdigest()
+        os.makedirs(os.path.dirname(self._path(stage, key, 'pkl')), exist_ok=True)
+        with open(self._path(stage, key, 'pkl'), 'wb') as f:
+            f.write(data)
+        meta = {'output_hash': output_hash,
+                'artifacts': list(output) if stage.kind == 'render' else []}
+        with open(self._path(stage, key, 'json'), 'w') as f:
+            json.dump(meta, f)
+        return output_hash
+
+
+# === RUNNER ===
+def _toposort(stages):
+    by_name = {s.name: s for s in stages}
+    order, seen = [], set()
+
+    def visit(name, path=()):
+        if name in path:
+            raise ValueError(f"cycle in analysis stages: {' -> '.join(path + (name,))}")
+        if name in seen:
+            return
+        if name not in by_name:
+            raise ValueError(f"unknown stage dependency: {name}")
+        for dep in by_name[name].deps:
+            visit(dep, path + (name,))
+        seen.add(name)
+        order.append(by_name[name])
+
+    for s in stages:
+        visit(s.name)
+    return order
+
+
+def run(stages, cache=None, workers=None, force=(), verbose=True):
+    """Run `stages` in dependency order, in parallel where possible.
+
+    A stage is skipped when its key (code + params + inputs + dependency output hashes)
+    is already cached, so only stages downstream of an actual change are recomputed.
+    Returns {stage name: output}; outputs of skipped stages are loaded lazily.
+    """
+    cache = cache or StageCache()
+    order = _toposort(stages)
+    keys, hashes, outputs = {}, {}, {}
+    ran, hit = [], []
+    by_name = {s.name: s for s in order}
+
+    def output(name):
+        if name not in outputs:
+            outputs[name] = cache.load(by_name[name], keys[name])
+        return outputs[name]
+
+    pending = list(order)
+    running = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for stage in [s for s in pending if all(d in hashes for d in s.deps)]:
+                pending.remove(stage)
+                keys[stage.name] = stage.key(hashes[d] for d in stage.deps)
+                cached = None if stage.name in force else cache.lookup(stage, keys[stage.name])
+                if cached is not None:
+                    hashes[stage.name] = cached
+                    hit.append(stage.name)
+                    continue
+                args = [output(d) for d in stage.deps]
+                running[pool.submit(_execute, stage.func, args, stage.params)] = stage
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                outputs[stage.name] = future.result()
+                hashes[stage.name] = cache.store(stage, keys[stage.name], outputs[stage.name])
+                ran.append(stage.name)
+                if verbose:
+                    print(f"  ran    {stage.name}")
+
+    if verbose:
+        print(f"  cached {len(hit)} stage(s), ran {len(ran)}")
+    return {name: (outputs[name] if name in outputs else _Lazy(output, name)) for name in by_name}
+
+
+class _Lazy:
+    def __init__(self, loader, name):
+        self.loader, self.name = loader, name
+
+    def get(self):
+        return self.loader(self.name)
+
+
+def result(value):
+    """Resolve an entry returned by `run` (cache hits are loaded on first access)."""
+    return value.get() if isinstance(value, _Lazy) else value
+
+
+# === FULL ANALYSIS ===
+def all_stages(data_dir='.', out_dir='.'):
+    import Linear_Regression_Sentiment_Analysis
+    import Trend_Analysis
+    import Wilcoxon_ranked_test
+
+    return (Trend_Analysis.stages(data_dir, out_dir)
+            + Linear_Regression_Sentiment_Analysis.stages(data_dir, out_dir)
+            + Wilcoxon_ranked_test.stages(data_dir, out_dir))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the docs/ analyses as a cached stage graph')
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--only', nargs='*', help='stage name prefixes to run (with their dependencies)')
+    parser.add_argument('--force', nargs='*', default=[], help='stages to re-run regardless of cache')
+    args = parser.parse_args()
+
+    stages = all_stages(args.data_dir, args.out_dir)
+    if args.only:
+        by_name = {s.name: s for s in stages}
+        wanted = {s.name for s in stages if any(s.name.startswith(p) for p in args.only)}
+        frontier = list(wanted)
+        while frontier:
+            for dep in by_name[frontier.pop()].deps:
+                if dep not in wanted:
+                    wanted.add(dep)
+                    frontier.append(dep)
+        stages = [s for s in stages if s.name in wanted]
+
+    results = run(stages, StageCache(args.cache), args.workers, set(args.force))
+    for stage in _toposort(stages):
+        if stage.kind == 'report':
+            print(result(results[stage.name]))
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from Wilcoxon_ranked_test import SEC
+
+# === CONFIGURATION ===
+# Every source is joined on the extension user ID (users.extension_user_id in Supabase).
+ID = 'extension_user_id'
+
+# Column holding the extension ID in each export. The public demographic export is the
+# Prolific download, which carries no ID column, so it has to be supplied with one.
+SURVEY_ID_COLUMN = 'Tree Growth extension ID'
+DEMOGRAPHIC_ID_COLUMN = ID
+COMMENT_ID_COLUMN = 'user_id'
+
+COHORTS = ['Age', 'Sex', 'Country of residence', 'Employment status']
+AGE_BANDS = [0, 24, 29, 34, 39, 200]
+AGE_LABELS = ['<25', '25-29', '30-34', '35-39', '40+']
+
+SENTIMENTS = ['positive', 'neutral', 'negative']
+
+CACHE_FILES = ('comments.parquet', 'participants.parquet')
+CACHE_MANIFEST = 'sources.json'
+
+
+# === LOADING ===
+def _check_ids(ids, source):
+    """Refuse to join on IDs that are missing or anonymized (e.g. 'User_######')."""
+    ids = ids.dropna().astype(str).str.strip()
+    masked = ids.str.fullmatch(r'[A-Za-z_]*#+')
+    if ids.empty or masked.all():
+        raise ValueError(f"{source}: no usable extension user IDs (column is empty or anonymized)")
+
+
+def load_comments(path, users_path=None):
+    """Comments keyed by extension ID. comments.user_id is the users.id FK, so a users
+    export (id, extension_user_id) is needed to translate it; without one, user_id must
+    already hold extension IDs (CohortEngine raises if nothing then joins)."""
+    df = pd.read_csv(path)
+    if users_path is not None:
+        users = pd.read_csv(users_path, usecols=['id', ID])
+        df = df.merge(users.rename(columns={'id': COMMENT_ID_COLUMN}), on=COMMENT_ID_COLUMN, how='inner')
+    else:
+        df[ID] = df[COMMENT_ID_COLUMN]
+    _check_ids(df[ID], path)
+    df = df.dropna(subset=[ID])
+    df['sentiment'] = df['sentiment'].str.strip().str.lower()
+    return df
+
+
+def load_survey(path):
+    """One row per respondent with the mean score of each survey section."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip().str.replace('"', '')
+    id_col = next(c for c in df.columns if c.startswith(SURVEY_ID_COLUMN))
+    _check_ids(df[id_col], path)
+    out = pd.DataFrame({ID: df[id_col].astype(str).str.strip()})
+    for sec, cols in SEC.items():
+        out[sec] = df[cols].apply(pd.to_numeric, errors='coerce').mean(axis=1, skipna=True)
+    return out.drop_duplicates(subset=ID, keep='last')
+
+
+def load_demographics(path, id_column=DEMOGRAPHIC_ID_COLUMN):
+    df = pd.read_csv(path)
+    if id_column not in df.columns:
+        raise ValueError(f"{path}: missing '{id_column}' column; add the extension user ID to the export")
+    _check_ids(df[id_column], path)
+    df = df.rename(columns={id_column: ID})
+    df[ID] = df[ID].astype(str).str.strip()
+    df['Age'] = pd.cut(pd.to_numeric(df['Age'], errors='coerce'), bins=AGE_BANDS, labels=AGE_LABELS)
+    return df[[ID] + COHORTS].drop_duplicates(subset=ID, keep='last')
+
+
+# === ENGINE ===
+class CohortEngine:
+    """Joins comments, survey and demographics once and answers every cohort query from
+    the cached frames. Cohort columns are stored as categoricals so group-bys and
+    cross-tabs work on integer codes rather than strings."""
+
+    def __init__(self, comments, survey, demographics, cache_path=None):
+        comments = comments.copy()
+        comments[ID] = comments[ID].astype(str).str.strip()
+        for s in SENTIMENTS:
+            comments[f'is_{s}'] = (comments['sentiment'] == s).astype(np.int8)
+
+        # comment level: one row per comment with its author's cohorts
+        self.comments = comments.merge(demographics, on=ID, how='inner')
+        if len(comments) and self.comments.empty:
+            raise ValueError("No comment matched a demographic extension ID; comments.user_id is the "
+                             "users.id key, so pass a users export (--users) to translate it")
+        # participant level: one row per user with comment aggregates and section scores
+        per_user = self.comments.groupby(ID, observed=True).agg(
+            comments=('sentiment', 'size'),
+            water_drops=('water_drops', 'sum'),
+            poison_drops=('poison_drops', 'sum'),
+            **{f'{s}_pct': (f'is_{s}', 'mean') for s in SENTIMENTS},
+        ).reset_index()
+        for s in SENTIMENTS:
+            per_user[f'{s}_pct'] *= 100
+        self.participants = demographics.merge(per_user, on=ID, how='left').merge(survey, on=ID, how='left')
+
+        for frame in (self.comments, self.participants):
+            for col in COHORTS:
+                frame[col] = frame[col].astype('category')
+
+        self._stats = None
+        if cache_path is not None:
+            self.save(cache_path)
+
+    @classmethod
+    def from_csv(cls, comments_path, survey_path, demographics_path, users_path=None,
+                 demographics_id=DEMOGRAPHIC_ID_COLUMN, cache_path=None):
+        """Build from the three CSV exports, or reload the columnar cache when it was built
+        from the same files (paths and modification times) and ID options."""
+        manifest = {
+            'sources': {name: [os.path.abspath(p), os.path.getmtime(p)] if p else None
+                        for name, p in [('comments', comments_path), ('survey', survey_path),
+                                        ('demographics', demographics_path), ('users', users_path)]},
+            'demographics_id': demographics_id,
+        }
+        if cache_path is not None and cls.cached(cache_path):
+            with open(os.path.join(cache_path, CACHE_MANIFEST)) as f:
+                if json.load(f) == manifest:
+                    return cls.load(cache_path)
+        engine = cls(load_comments(comments_path, users_path),
+                     load_survey(survey_path),
+                     load_demographics(demographics_path, demographics_id),
+                     cache_path=cache_path)
+        if cache_path is not None:
+            with open(os.path.join(cache_path, CACHE_MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+        return engine
+
+    @staticmethod
+    def cached(path):
+        """True when `path` holds both parquet frames and the manifest they were built from."""
+        return all(os.path.exists(os.path.join(path, f)) for f in CACHE_FILES + (CACHE_MANIFEST,))
+
+    # --- columnar cache (parquet, requires pyarrow) ---
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.comments.to_parquet(os.path.join(path, 'comments.parquet'), index=False)
+        self.participants.to_parquet(os.path.join(path, 'participants.parquet'), index=False)
+
+    @classmethod
+    def load(cls, path):
+        engine = cls.__new__(cls)
+        engine.comments = pd.read_parquet(os.path.join(path, 'comments.parquet'))
+        engine.participants = pd.read_parquet(os.path.join(path, 'participants.parquet'))
+        engine._stats = None
+        return engine
+
+    # --- statistics ---
+    @staticmethod
+    def _long(frame, values):
+        """Stack every cohort column into (dimension, cohort) so one group-by covers all of them."""
+        long = frame.melt(id_vars=values, value_vars=COHORTS, var_name='dimension', value_name='cohort')
+        return long.dropna(subset=['cohort'])
+
+    def comment_stats(self):
+        """Sentiment mix and drop totals per cohort, from the comment-level frame."""
+        values = ['water_drops', 'poison_drops', 'confidence'] + [f'is_{s}' for s in SENTIMENTS]
+        grouped = self._long(self.comments, values).groupby(['dimension', 'cohort'], observed=True)
+        out = grouped.agg(
+            comments=('water_drops', 'size'),
+            water_drops=('water_drops', 'sum'),
+            poison_drops=('poison_drops', 'sum'),
+            mean_confidence=('confidence', 'mean'),
+            **{f'{s}_pct': (f'is_{s}', 'mean') for s in SENTIMENTS},
+        )
+        for s in SENTIMENTS:
+            out[f'{s}_pct'] *= 100
+        total = out['water_drops'] + out['poison_drops']
+        out['water_pct'] = (out['water_drops'] / total * 100).fillna(0)
+        out['water_poison_ratio'] = out['water_drops'] / (out['poison_drops'] + 1)
+        return out
+
+    def participant_stats(self):
+        """Participant counts and survey-section scores per cohort (one vote per user)."""
+        values = list(SEC) + [f'{s}_pct' for s in SENTIMENTS]
+        grouped = self._long(self.participants, values).groupby(['dimension', 'cohort'], observed=True)
+        out = grouped[values].agg(['mean', 'median'])
+        out.columns = [f'{col}_{stat}' for col, stat in out.columns]
+        out.insert(0, 'participants', grouped.size())
+        out.insert(1, 'respondents', grouped[list(SEC)[0]].count())
+        return out
+
+    def stats(self):
+        """Every comment and survey statistic for every cohort, computed once and cached."""
+        if self._stats is None:
+            self._stats = self.comment_stats().join(self.participant_stats(), how='outer')
+        return self._stats
+
+    def cohort(self, dimension):
+        return self.stats().loc[dimension]
+
+    def crosstab(self, rows, columns='sentiment', normalize='index'):
+        """Cross-tab of any two comment-level columns, e.g. ('Country of residence', 'sentiment')."""
+        table = pd.crosstab(self.comments[rows], self.comments[columns], normalize=normalize)
+        return table * 100 if normalize else table
+
+
+# === CLI ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cohort statistics across comments, survey and demographics')
+    parser.add_argument('--comments', default='comments_rows.csv')
+    parser.add_argument('--survey', default='Post_study_report.csv')
+    parser.add_argument('--demographics', default='demographic_data.csv')
+    parser.add_argument('--users', default=None, help='users export (id, extension_user_id) to map comments.user_id')
+    parser.add_argument('--demographics-id', default=DEMOGRAPHIC_ID_COLUMN)
+    parser.add_argument('--cache', default=None, help='directory for the columnar cache')
+    parser.add_argument('--crosstab', nargs=2, metavar=('ROWS', 'COLUMNS'))
+    args = parser.parse_args()
+
+    engine = CohortEngine.from_csv(args.comments, args.survey, args.demographics, args.users,
+                                   args.demographics_id, args.cache)
+    pd.set_option('display.width', 200)
+    if args.crosstab:
+        print(engine.crosstab(*args.crosstab).round(1).to_string())
+    else:
+        for dimension in COHORTS:
+            print("\n" + "=" * 80)
+            print(f"COHORTS BY {dimension.upper()}")
+            print("=" * 80)
+            print(engine.cohort(dimension).to_string(float_format='%.2f'))
@@ -0,0 +1,199 @@
+import argparse
+import json
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+# === CONFIGURATION ===
+WINDOW_SECONDS = 300       # five-minute windows
+MAX_WINDOWS = 288          # one day of five-minute windows kept in memory
+CONFIDENCE_BINS = 20       # equal-width bins over [0, 1]
+ALERT_DIVERGENCE = 0.05    # Jensen-Shannon divergence (base 2) that counts as drift
+
+DIMENSIONS = ('layer', 'category', 'sentiment', 'confidence')
+
+
+# === SKETCH ===
+class WindowSketch:
+    """Counts for one time window. Layers, categories and sentiments are small closed sets
+    and confidence is a fixed histogram, so memory does not grow with traffic."""
+
+    def __init__(self, start):
+        self.start = start
+        self.n = 0
+        self.layer = Counter()
+        self.category = Counter()
+        self.sentiment = Counter()
+        self.confidence = np.zeros(CONFIDENCE_BINS, dtype=np.int64)
+
+    def add(self, layer, category, sentiment, confidence=None):
+        self.n += 1
+        self.layer[layer] += 1
+        self.category[category] += 1
+        self.sentiment[sentiment] += 1
+        # missing (None/NaN) confidence is skipped; out-of-range values are clipped to [0, 1]
+        if confidence is not None and not math.isnan(confidence):
+            confidence = min(max(float(confidence), 0.0), 1.0)
+            self.confidence[min(int(confidence * CONFIDENCE_BINS), CONFIDENCE_BINS - 1)] += 1
+
+    def merge(self, other):
+        self.n += other.n
+        self.layer.update(other.layer)
+        self.category.update(other.category)
+        self.sentiment.update(other.sentiment)
+        self.confidence += other.confidence
+        return self
+
+    def distribution(self, dimension):
+        if dimension == 'confidence':
+            return {i: int(c) for i, c in enumerate(self.confidence) if c}
+        return dict(getattr(self, dimension))
+
+    def to_dict(self):
+        return {
+            'start': self.start,
+            'n': self.n,
+            'layer': dict(self.layer),
+            'category': dict(self.category),
+            'sentiment': dict(self.sentiment),
+            'confidence': self.confidence.tolist(),
+        }
+
+
+def js_divergence(p, q):
+    """Jensen-Shannon divergence (base 2, in [0, 1]) between two count dicts."""
+    keys = set(p) | set(q)
+    sp, sq = sum(p.values()), sum(q.values())
+    if not keys or not sp or not sq:
+        return 0.0
+    total = 0.0
+    for k in keys:
+        a, b = p.get(k, 0) / sp, q.get(k, 0) / sq
+        m = (a + b) / 2
+        if a:
+            total += a * math.log2(a / m) / 2
+        if b:
+            total += b * math.log2(b / m) / 2
+    return total
+
+
+# === MONITOR ===
+class DriftMonitor:
+    """Streaming per-window sketches of classifier decisions with divergence against a
+    reference window.
+
+    Feed it with `record` (Integrated_testing_logic does this when its `monitor` is set).
+    Windows are keyed by `window_seconds` buckets of the record timestamp, or by an explicit
+    `window` key when replaying historical data. Closed windows are appended to
+    `snapshot_path` (JSON lines) as soon as the next window starts.
+    """
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, max_windows=MAX_WINDOWS,
+                 alert=ALERT_DIVERGENCE, snapshot_path=None):
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.alert = alert
+        self.snapshot_path = snapshot_path
+        self.windows = OrderedDict()
+        self.reference = None
+        self._lock = threading.RLock()   # re-entrant: dump() and _on_close() call snapshot()
+
+    def record(self, layer, category, sentiment, confidence=None, ts=None, window=None):
+        if window is None:
+            ts = time.time() if ts is None else ts
+            window = int(ts // self.window_seconds) * self.window_seconds
+        with self._lock:
+            sketch = self.windows.get(window)
+            if sketch is None:
+                closed = next(reversed(self.windows.values()), None)
+                sketch = self.windows[window] = WindowSketch(window)
+                if closed is not None:
+                    self._on_close(closed)
+                while len(self.windows) > self.max_windows:
+                    self.windows.popitem(last=False)
+            sketch.add(layer, category, sentiment, confidence)
+
+    def _on_close(self, sketch):
+        if self.reference is None:
+            self.reference = WindowSketch('reference').merge(sketch)
+        if self.snapshot_path:
+            with open(self.snapshot_path, 'a') as f:
+                f.write(json.dumps(self.snapshot(sketch.start)) + "\n")
+
+    def set_reference(self, windows=None):
+        """Use the merge of `windows` (default: every window held) as the reference."""
+        with self._lock:
+            keys = list(self.windows) if windows is None else windows
+            self.reference = WindowSketch('reference')
+            for key in keys:
+                self.reference.merge(self.windows[key])
+
+    def divergence(self, window):
+        """Per-dimension Jensen-Shannon divergence of `window` against the reference."""
+        with self._lock:
+            sketch = self.windows[window]
+            if self.reference is None:
+                return {d: 0.0 for d in DIMENSIONS}
+            return {d: js_divergence(sketch.distribution(d), self.reference.distribution(d)) for d in DIMENSIONS}
+
+    def snapshot(self, window=None):
+        """JSON-ready view of one window (default: the latest) with its divergences."""
+        with self._lock:
+            if window is None:
+                if not self.windows:
+                    raise ValueError("No window recorded yet")
+                window = next(reversed(self.windows))
+            div = self.divergence(window)
+            return {**self.windows[window].to_dict(),
+                    'divergence': div,
+                    'drift': sorted(d for d, v in div.items() if v >= self.alert)}
+
+    def dump(self, path):
+        """Write every window held, the reference and the divergences to `path`."""
+        with self._lock:
+            data = {
+                'window_seconds': self.window_seconds,
+                'reference': self.reference.to_dict() if self.reference else None,
+                'windows': [self.snapshot(w) for w in self.windows],
+            }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+# === REPLAY ===
+def replay(comments_path, monitor=None):
+    """Feed a comments export through the monitor, one window per study week."""
+    import pandas as pd
+
+    df = pd.read_csv(comments_path).sort_values('week_number')
+    monitor = monitor or DriftMonitor(max_windows=df['week_number'].nunique())
+    for week, category, sentiment, conf in zip(df['week_number'], df['category'], df['sentiment'], df['confidence']):
+        monitor.record('deployment', category, sentiment, conf, window=int(week))
+    return monitor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay a comments export through the drift monitor')
+    parser.add_argument('comments', nargs='?', default='comments_rows.csv')
+    parser.add_argument('--reference', type=int, nargs='*', help='weeks used as the reference (default: first week)')
+    parser.add_argument('--dump', help='write the full snapshot JSON here')
+    args = parser.parse_args()
+
+    monitor = replay(args.comments)
+    if args.reference:
+        monitor.set_reference(args.reference)
+
+    print("=" * 80)
+    print("WEEKLY DRIFT AGAINST REFERENCE (Jensen-Shannon divergence)")
+    print("=" * 80)
+    print(f"  {'week':>4} {'n':>6} " + " ".join(f"{d:>10}" for d in DIMENSIONS) + "  drift")
+    for week in monitor.windows:
+        snap = monitor.snapshot(week)
+        print(f"  {week:>4} {snap['n']:>6} " + " ".join(f"{snap['divergence'][d]:>10.4f}" for d in DIMENSIONS)
+              + "  " + (", ".join(snap['drift']) or "-"))
+    if args.dump:
+        monitor.dump(args.dump)
+        print(f"\nSnapshot written to {args.dump}")
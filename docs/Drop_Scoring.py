@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+# === CONFIGURATION ===
+HERE = os.path.dirname(os.path.abspath(__file__))
+DETECTION_SERVICE = os.path.join(HERE, '..', 'detection-service.js')
+
+# detection-service.js normalizeCategory(), exactly; anything else passes through unchanged
+CATEGORY_NAMES = {
+    'normal': 'Normal', 'clean': 'Normal', 'non-toxic': 'Normal',
+    'profanity': 'Profanity',
+    'microaggression': 'Microaggression',
+    'derogatory': 'Derogatory',
+    'trolling': 'Trolling',
+    'hate': 'Hate Speech', 'hate speech': 'Hate Speech',
+}
+
+# Categories Integrated_testing_logic emits, for the tree_update policy
+TREE_UPDATE_NAMES = {
+    **CATEGORY_NAMES,
+    'ai_normal': 'Normal', 'positive_keyword': 'Normal',
+    'hate_speech': 'Hate Speech',
+}
+
+# fromCategory(): minimum drop count per category (Hate Speech is always 10, Normal always +1)
+CATEGORY_FLOOR = {'Profanity': 2, 'Microaggression': 3, 'Derogatory': 4, 'Trolling': 5}
+UNKNOWN_FLOOR = 2
+
+NEUTRAL_CONFIDENCE = 0.55   # model_result() awards Neutral below this
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+
+# === HELPERS ===
+def js_round(x):
+    """Math.round: halves go up (NumPy rounds them to even)."""
+    r = np.floor(x)
+    return r + (x - r >= 0.5)
+
+
+def _lookup(values, table, default=None):
+    """Map a string array through `table` once per distinct value, not once per row."""
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    mapped = np.array([table.get(u.strip().lower(), u if default is None else default) for u in uniques],
+                      dtype=object)
+    return mapped[inverse.reshape(-1)]
+
+
+def _or_default(x, default):
+    """JS `x || default` for numbers: 0 and NaN take the default."""
+    x = np.asarray(x, dtype=np.float64)
+    return np.where(np.isnan(x) | (x == 0), default, x)
+
+
+def _int(x):
+    """Drop counts as int64, unless NaN reached them (as it does in JS), then float64."""
+    x = np.asarray(x, dtype=np.float64)
+    return x if np.isnan(x).any() else x.astype(np.int64)
+
+
+def _result(sentiment, water, poison, impact=None, category=None):
+    water = _int(water)
+    poison = _int(poison)
+    out = {
+        'sentiment': sentiment,
+        'impact': np.maximum(water, poison) if impact is None else _int(impact),
+        'water_drops': water,
+        'poison_drops': poison,
+    }
+    if category is not None:
+        out['category'] = category
+    return out
+
+
+# === POLICIES ===
+def score_category(category, confidence):
+    """detection-service.js fromCategory()."""
+    category = _lookup(category, CATEGORY_NAMES)
+    conf = np.clip(_or_default(confidence, 0.5), 0, 1)
+    scaled = js_round(conf * 10)
+
+    floors = {**CATEGORY_FLOOR, 'Normal': 0, 'Hate Speech': 10}
+    floor = _lookup(category, {k.lower(): v for k, v in floors.items()}, UNKNOWN_FLOOR).astype(np.float64)
+    normal = category == 'Normal'
+    impact = np.where(normal, 1, np.minimum(10, np.maximum(floor, scaled)))
+    impact = np.where(category == 'Hate Speech', 10, impact)
+
+    return _result(np.where(normal, 'positive', 'negative'),
+                   np.where(normal, impact, 0), np.where(normal, 0, impact), impact, category)
+
+
+def score_sentiment_toxicity(sentiment, toxicity, confidence):
+    """detection-service.js fromSentimentToxicity().
+
+    Sentiment is matched exactly, without trimming or lower-casing, as JS `includes` does.
+    NaN toxicity behaves as in JS: every comparison with it is false, so a positive or neutral
+    row gets no drops and a negative row gets NaN poison drops.
+    """
+    raw = np.asarray(sentiment, dtype=object)
+    sentiment = np.where(np.isin(raw, SENTIMENTS), raw, 'neutral').astype(object)
+    tox = np.asarray(toxicity, dtype=np.float64)
+    conf_mul = np.maximum(0.3, _or_default(confidence, 0.5))
+
+    positive = (sentiment == 'positive') & (tox < 0.3)
+    negative = ~positive & ((sentiment == 'negative') | (tox > 0.5))
+    neutral = ~positive & ~negative & (sentiment == 'neutral') & (tox < 0.3)
+
+    water = np.where(positive, js_round((2 - tox) * conf_mul * 2), 0)
+    water = np.where(neutral, js_round(0.5 * conf_mul), water)
+    poison = np.where(negative, js_round((tox + 0.5) * conf_mul * 2), 0)
+
+    return _result(sentiment, water, poison,
+                   category=np.where(sentiment == 'positive', 'Normal', 'Trolling').astype(object))
+
+
+def score_tree_update(category, confidence=None):
+    """Integrated_testing_logic.get_tree_update_final(): +3 Water, -3 Poison, or +2 Water for Neutral.
+
+    NaN confidence marks a rule-layer decision (keyword layer), which never falls back to Neutral.
+    """
+    category = _lookup(category, TREE_UPDATE_NAMES)
+    n = len(category)
+    conf = np.full(n, np.nan) if confidence is None else np.asarray(confidence, dtype=np.float64)
+
+    neutral = (category == 'OOD_FALLBACK') | (conf < NEUTRAL_CONFIDENCE)
+    positive = ~neutral & (category == 'Normal')
+    sentiment = np.where(neutral, 'Neutral', np.where(positive, 'Positive', 'Negative'))
+
+    water = np.where(neutral, 2, np.where(positive, 3, 0))
+    poison = np.where(neutral | positive, 0, 3)
+    return _result(sentiment, water, poison)
+
+
+def score_backend(sentiment):
+    """backend-integration.js comments.create(): one drop per comment, impact always 1."""
+    sentiment = np.asarray(sentiment, dtype=str)
+    water = (sentiment == 'positive').astype(np.int64)
+    poison = (sentiment == 'negative').astype(np.int64)
+    return _result(sentiment, water, poison, np.ones(len(sentiment)))
+
+
+POLICIES = {
+    'category': (score_category, ('category', 'confidence'), ()),
+    'sentiment_toxicity': (score_sentiment_toxicity, ('sentiment', 'toxicity', 'confidence'), ()),
+    'tree_update': (score_tree_update, ('category',), ('confidence',)),
+    'backend': (score_backend, ('sentiment',), ()),
+}
+
+
+def score(policy, **columns):
+    """Score whole columns with one of POLICIES.
+
+    Returns a dict of equal-length arrays: sentiment, impact, water_drops, poison_drops
+    (plus category for the detection-service policies).
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; choose from {', '.join(POLICIES)}")
+    func, needs, optional = POLICIES[policy]
+    missing = [c for c in needs if columns.get(c) is None]
+    if missing:
+        raise ValueError(f"Policy {policy!r} needs column(s): {', '.join(missing)}")
+    return func(*(columns.get(c) for c in needs + optional))
+
+
+def score_frame(df, policy):
+    """Score a DataFrame that has the policy's input columns; returns a new DataFrame."""
+    import pandas as pd
+
+    _, needs, optional = POLICIES[policy]
+    return pd.DataFrame(score(policy, **{c: df[c].to_numpy() for c in needs + optional if c in df}), index=df.index)
+
+
+# === PARITY WITH THE JS FORMULAS ===
+_PARITY_JS = """
+import { readFileSync } from 'node:fs';
+import { ExtensionDetectionService } from './detection-service.mjs';
+const svc = Object.create(ExtensionDetectionService.prototype);
+// null stands in for NaN, which JSON cannot carry
+const num = v => (v === null ? NaN : v);
+const cases = JSON.parse(readFileSync(0, 'utf8'));
+const pick = r => [r.category, r.sentiment, r.impact, r.waterDrops, r.poisonDrops];
+process.stdout.write(JSON.stringify({
+  category: cases.category.map(([c, s]) => pick(svc.fromCategory(c, num(s), 'parity'))),
+  sentiment_toxicity: cases.sentiment_toxicity.map(([s, t, c]) => pick(svc.fromSentimentToxicity(s, num(t), num(c), 'parity'))),
+}));
+"""
+
+
+def _grid():
+    values = np.round(np.linspace(0, 1, 201), 3)   # includes every .x5 tie that Math.round breaks upwards
+    categories = ['Normal', 'clean', 'non-toxic', 'Profanity', 'Microaggression', 'Derogatory',
+                  'Trolling', 'hate', 'Hate Speech', 'spam',
+                  # Integrated_testing_logic names, which fromCategory() does not normalise
+                  'AI_NORMAL', 'POSITIVE_KEYWORD', 'TROLLING', 'HATE_SPEECH', 'OOD_FALLBACK']
+    # fromSentimentToxicity() compares the raw string, so case and padding fall back to neutral
+    sentiments = ['positive', 'negative', 'neutral', 'mixed', 'Positive', ' negative', 'NEUTRAL']
+    toxicities = list(values[::4]) + [np.nan]
+    return {
+        'category': [(c, float(s)) for c in categories for s in list(values) + [np.nan]],
+        'sentiment_toxicity': [(s, float(t), float(c)) for s in sentiments for t in toxicities for c in values[::4]],
+    }
+
+
+def parity(node='node', js_path=DETECTION_SERVICE):
+    """Run detection-service.js under node over a grid of inputs and compare every field.
+
+    Also checks the tree_update policy against Integrated_testing_logic.model_result().
+    Returns {policy: number of mismatching rows}.
+    """
+    cases = _grid()
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(js_path, encoding='utf-8') as src, open(os.path.join(tmp, 'detection-service.mjs'), 'w') as dst:
+            dst.write(src.read())
+        with open(os.path.join(tmp, 'parity.mjs'), 'w') as f:
+            f.write(_PARITY_JS)
+        payload = {p: [[None if isinstance(v, float) and np.isnan(v) else v for v in r] for r in rows]
+                   for p, rows in cases.items()}
+        proc = subprocess.run([node, 'parity.mjs'], cwd=tmp, input=json.dumps(payload),
+                              capture_output=True, text=True, check=True)
+    expected = json.loads(proc.stdout)
+
+    mismatches = {}
+    for policy, rows in cases.items():
+        names = POLICIES[policy][1]
+        got = score(policy, **{n: np.array([r[i] for r in rows]) for i, n in enumerate(names)})
+        # JSON.stringify writes NaN as null
+        ours = zip(got['category'], got['sentiment'], got['impact'], got['water_drops'], got['poison_drops'])
+        mismatches[policy] = sum(list(map(_plain, a)) != b for a, b in zip(ours, expected[policy]))
+
+    import Integrated_testing_logic as classifier
+    conf = np.round(np.linspace(0, 1, 101), 2)
+    idx = np.repeat(np.arange(6), len(conf))
+    conf = np.tile(conf, 6)
+    reference = [classifier.model_result(i, c)['Score'] for i, c in zip(idx, conf)]
+    names = np.array(['AI_NORMAL', 'TROLLING', 'PROFANITY', 'DEROGATORY', 'HATE_SPEECH', 'MICROAGGRESSION'])
+    categories = list(names[idx])
+    # rule layers carry no confidence
+    for text in ['great post', 'you idiot', 'lol cope']:
+        result = classifier.keyword_layer(text)
+        categories.append(result['Category'])
+        reference.append(result['Score'])
+    categories.append('OOD_FALLBACK')
+    reference.append(classifier.NEUTRAL_FALLBACK['Score'])
+    conf = np.concatenate([conf, np.full(len(categories) - len(conf), np.nan)])
+    got = score('tree_update', category=np.array(categories), confidence=conf)
+    mismatches['tree_update'] = int(np.sum(got['water_drops'] - got['poison_drops'] != reference))
+    return mismatches
+
+
+def _plain(v):
+    v = v.item() if isinstance(v, np.generic) else v
+    return None if isinstance(v, float) and np.isnan(v) else v
+
+
+# === BENCHMARK ===
+def benchmark(n=1_000_000, seed=0):
+    """Rows per second for each policy on `n` random rows."""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'category': rng.choice(['Normal', 'Profanity', 'Microaggression', 'Derogatory', 'Trolling', 'Hate Speech'], n),
+        'sentiment': rng.choice(list(SENTIMENTS), n),
+        'confidence': rng.random(n),
+        'toxicity': rng.random(n),
+    }
+    rates = {}
+    for policy, (_, needs, optional) in POLICIES.items():
+        start = time.perf_counter()
+        score(policy, **{c: columns[c] for c in needs + optional})
+        rates[policy] = n / (time.perf_counter() - start)
+    return rates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Vectorised water/poison drop scoring')
+    parser.add_argument('--parity', action='store_true', help='compare against detection-service.js (needs node)')
+    parser.add_argument('--bench', type=int, metavar='N', help='time every policy on N random rows')
+    parser.add_argument('--rescore', metavar='CSV', help='rescore a comments export, e.g. comments_rows.csv')
+    parser.add_argument('--policy', choices=list(POLICIES), default='category')
+    args = parser.parse_args()
+
+    if args.parity:
+        for policy, bad in parity().items():
+            print(f"  • {policy}: {'OK' if not bad else f'{bad} mismatches'}")
+    if args.bench:
+        for policy, rate in benchmark(args.bench).items():
+            print(f"  • {policy}: {rate:,.0f} rows/s")
+    if args.rescore:
+        import pandas as pd
+
+        df = pd.read_csv(args.rescore)
+        scored = score_frame(df, args.policy)
+        print(f"Rescored {len(df):,} comments with the {args.policy!r} policy")
+        for col in ('water_drops', 'poison_drops'):
+            same = (scored[col] == df[col]).mean() * 100 if col in df else float('nan')
+            print(f"  • {col}: total {scored[col].sum():,} (stored {df[col].sum():,}), {same:.1f}% rows unchanged")
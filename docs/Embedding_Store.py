@@ -0,0 +1,338 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# === CONFIGURATION ===
+HERE = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.path.join(HERE, '.embedding_store')
+
+DTYPE = np.float16       # on-disk precision of embeddings and logits
+BATCH_SIZE = 32
+CHUNK_ROWS = 65536       # rows scored per step in brute-force search
+IVF_LISTS = 64           # k-means cells of the IVF index
+IVF_PROBES = 8           # cells visited per query
+
+
+def text_key(text):
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()[:16]
+
+
+# === STORE ===
+class EmbeddingStore:
+    """Pooled [CLS] embeddings and logits of every text encoded so far.
+
+    Layout of `path`:
+      embeddings.f16  (rows, hidden)      float16, memory-mapped
+      logits.f16      (rows, num_labels)  float16, memory-mapped
+      index.json      model path, shapes and the text-hash key of every row
+    Rows are only ever appended, so row ids stay valid across runs. index.json is the
+    source of truth: bytes past its last key (left by an interrupted append) are cut off
+    before the next append, and each batch reaches disk before its keys are recorded.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.meta = None
+        self.rows = {}
+        self._embeddings = self._logits = None
+        index = os.path.join(path, 'index.json')
+        if os.path.exists(index):
+            with open(index) as f:
+                self.meta = json.load(f)
+            self.rows = {k: i for i, k in enumerate(self.meta['keys'])}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, text):
+        return text_key(text) in self.rows
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _map(self, name, width):
+        if not self.rows:
+            return np.zeros((0, width), dtype=DTYPE)
+        return np.memmap(self._file(name), dtype=DTYPE, mode='r', shape=(len(self.rows), width))
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = self._map('embeddings.f16', self.meta['hidden'])
+        return self._embeddings
+
+    @property
+    def logits(self):
+        if self._logits is None:
+            self._logits = self._map('logits.f16', self.meta['num_labels'])
+        return self._logits
+
+    def lookup(self, texts):
+        """Row id of every text, -1 where it has not been encoded."""
+        return np.array([self.rows.get(text_key(t), -1) for t in texts], dtype=np.int64)
+
+    def add(self, texts, batch_size=BATCH_SIZE, verbose=False):
+        """Encode the texts that are not stored yet and append them. Returns the row ids of `texts`."""
+        import Integrated_testing_logic as classifier
+
+        if self.meta and self.meta['model_path'] != classifier.model_path:
+            raise ValueError(f"{self.path} holds {self.meta['model_path']} features, "
+                             f"not {classifier.model_path}; use another store path")
+
+        pending = {}
+        for t in texts:
+            key = text_key(t)
+            if key not in self.rows and key not in pending:
+                pending[key] = str(t)
+        if pending:
+            os.makedirs(self.path, exist_ok=True)
+            self._truncate()
+            keys, todo = list(pending), list(pending.values())
+            start = time.perf_counter()
+            with open(self._file('embeddings.f16'), 'ab') as fe, open(self._file('logits.f16'), 'ab') as fl:
+                for i in range(0, len(todo), batch_size):
+                    emb, logits = encode(todo[i:i + batch_size])
+                    fe.write(emb.astype(DTYPE).tobytes())
+                    fl.write(logits.astype(DTYPE).tobytes())
+                    for f in (fe, fl):
+                        f.flush()
+                        os.fsync(f.fileno())
+                    if self.meta is None:
+                        self.meta = {'model_path': classifier.model_path, 'hidden': emb.shape[1],
+                                     'num_labels': logits.shape[1], 'keys': []}
+                    # keys are committed per batch so an interrupted run keeps what it wrote
+                    self.meta['keys'].extend(keys[i:i + batch_size])
+                    self._save_index()
+            if verbose:
+                print(f"  • encoded {len(todo):,} new texts in {time.perf_counter() - start:.1f}s")
+            self.rows = {k: i for i, k in enumerate(self.meta['keys'])}
+            self._embeddings = self._logits = None
+        return self.lookup(texts)
+
+    def _truncate(self):
+        """Cut both matrices back to the rows index.json knows about."""
+        n = len(self.meta['keys']) if self.meta else 0
+        for name, width in (('embeddings.f16', 'hidden'), ('logits.f16', 'num_labels')):
+            path = self._file(name)
+            size = n * self.meta[width] * np.dtype(DTYPE).itemsize if self.meta else 0
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+            elif os.path.exists(path) and os.path.getsize(path) < size:
+                raise ValueError(f"{path} is shorter than {self._file('index.json')} says; the store is damaged")
+
+    def _save_index(self):
+        tmp = self._file('index.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file('index.json'))
+
+    def features(self, texts, **kwargs):
+        """(embeddings, logits) float32 arrays for `texts`, encoding only the missing ones."""
+        rows = self.add(texts, **kwargs)
+        return np.asarray(self.embeddings[rows], dtype=np.float32), np.asarray(self.logits[rows], dtype=np.float32)
+
+    def predict(self, texts, **kwargs):
+        """Same (pred_idx, conf) as Integrated_testing_logic.bert_predict, from the cached logits."""
+        _, logits = self.features(texts, **kwargs)
+        probs = _softmax(logits)
+        return probs.argmax(axis=1), probs.max(axis=1)
+
+
+def encode(texts):
+    """Pooled [CLS] output and logits of the classifier model for one batch."""
+    import torch
+    import Integrated_testing_logic as classifier
+
+    tokenizer, model = classifier.load_model()
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, padding=True, max_length=128).to(classifier.device)
+    with torch.no_grad():
+        pooled = model.bert(**inputs).pooler_output
+        logits = model.classifier(pooled)
+    return pooled.float().cpu().numpy(), logits.float().cpu().numpy()
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norm = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norm == 0, 1, norm)
+
+
+def _top_k(scores, k):
+    k = min(k, scores.shape[1])
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=1), axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+
+# === NEAREST NEIGHBOURS ===
+def search(matrix, queries, k=10, chunk_rows=CHUNK_ROWS):
+    """Exact cosine search. Returns (row ids, similarities), both (len(queries), k)."""
+    q = _normalize(queries)
+    best_idx = np.zeros((len(q), 0), dtype=np.int64)
+    best_sim = np.zeros((len(q), 0), dtype=np.float32)
+    for start in range(0, len(matrix), chunk_rows):
+        block = _normalize(matrix[start:start + chunk_rows])
+        idx, sim = _top_k(q @ block.T, k)
+        best_idx = np.concatenate([best_idx, idx + start], axis=1)
+        best_sim = np.concatenate([best_sim, sim], axis=1)
+        keep, best_sim = _top_k(best_sim, k)
+        best_idx = np.take_along_axis(best_idx, keep, axis=1)
+    return best_idx, best_sim
+
+
+class IVFIndex:
+    """Inverted-file index: spherical k-means cells, searched `nprobe` cells at a time."""
+
+    def __init__(self, centroids, assignments):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.rows = len(assignments)       # store size the index was built for
+        order = np.argsort(assignments, kind='stable')
+        self.members = np.split(order, np.cumsum(np.bincount(assignments, minlength=len(centroids)))[:-1])
+
+    @classmethod
+    def build(cls, matrix, n_lists=IVF_LISTS, iterations=10, seed=42):
+        x = _normalize(matrix)
+        n_lists = min(n_lists, len(x))
+        rng = np.random.default_rng(seed)
+        centroids = x[rng.choice(len(x), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = (x @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, x)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        return cls(centroids, (x @ centroids.T).argmax(axis=1))
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['centroids'], data['assignments'])
+
+    def search(self, matrix, queries, k=10, nprobe=IVF_PROBES):
+        q = _normalize(queries)
+        cells = np.argsort(-(q @ self.centroids.T), axis=1)[:, :nprobe]
+        ids = np.full((len(q), k), -1, dtype=np.int64)
+        sims = np.full((len(q), k), -np.inf, dtype=np.float32)
+        for i, probe in enumerate(cells):
+            candidates = np.concatenate([self.members[c] for c in probe])
+            if len(candidates):
+                idx, sim = _top_k(q[i:i + 1] @ _normalize(matrix[candidates]).T, k)
+                ids[i, :idx.shape[1]] = candidates[idx[0]]
+                sims[i, :idx.shape[1]] = sim[0]
+        return ids, sims
+
+
+# === HEADS ON CACHED FEATURES ===
+def train_head(features, labels, C=1.0, max_iter=1000):
+    """Logistic-regression head over cached embeddings (seconds, no encoder pass)."""
+    from sklearn.linear_model import LogisticRegression
+
+    return LogisticRegression(C=C, max_iter=max_iter).fit(features, labels)
+
+
+def head_report(dataset_path, store=None, thresholds=(0.5, 0.55, 0.6, 0.7, 0.8, 0.9)):
+    """Fit a head on the cached train split and compare it with the fine-tuned head on the test split."""
+    from Fast_Path_Classifier import load_splits
+
+    store = store or EmbeddingStore()
+    train_df, _, test_df = load_splits(dataset_path)
+    X_train, _ = store.features(train_df['Comment'].tolist(), verbose=True)
+    X_test, logits = store.features(test_df['Comment'].tolist(), verbose=True)
+    y_train, y_test = train_df['Label'].to_numpy(), test_df['Label'].to_numpy()
+
+    start = time.perf_counter()
+    head = train_head(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    probs = head.predict_proba(X_test)
+    bert_probs = _softmax(logits)
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append("CACHED-FEATURE HEAD REPORT (test split)")
+    lines.append("=" * 80)
+    lines.append(f"  • Store: {len(store):,} texts, {store.meta['hidden']}-d, model {store.meta['model_path']}")
+    lines.append(f"  • New head fitted on {len(X_train):,} cached rows in {fit_time:.1f}s")
+    lines.append(f"  • Fine-tuned head accuracy: {np.mean(bert_probs.argmax(axis=1) == y_test) * 100:.1f}%")
+    lines.append(f"  • New head accuracy: {np.mean(probs.argmax(axis=1) == y_test) * 100:.1f}%")
+    lines.append("\nLayer 3 Neutral threshold on the fine-tuned logits:")
+    lines.append(f"  {'threshold':>9} {'neutral':>8} {'accuracy of the rest':>21}")
+    for t in thresholds:
+        kept = bert_probs.max(axis=1) >= t
+        acc = np.mean(bert_probs[kept].argmax(axis=1) == y_test[kept]) * 100 if kept.any() else 0.0
+        lines.append(f"  {t:>9.2f} {(~kept).mean() * 100:>7.1f}% {acc:>20.1f}%")
+    lines.append("=" * 80)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cache BERT [CLS] embeddings and logits for reuse')
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--build', metavar='CSV', help='encode a comments export, e.g. comments_rows.csv')
+    parser.add_argument('--column', default='comment_text')
+    parser.add_argument('--ivf', type=int, metavar='LISTS', help='build an IVF index with this many cells')
+    parser.add_argument('--similar', nargs='+', metavar='TEXT', help='nearest stored comments to these texts')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--heads', metavar='DATASET', help='Trawling for Trolling Dataset.csv: fit a head on cached features')
+    args = parser.parse_args()
+
+    store = EmbeddingStore(args.store)
+    ivf_path = os.path.join(args.store, 'ivf.npz')
+    if args.build:
+        import pandas as pd
+
+        df = pd.read_csv(args.build)
+        store.add(df[args.column].fillna('').astype(str).tolist(), verbose=True)
+        texts_path = os.path.join(args.store, 'texts.json')
+        texts = {}
+        if os.path.exists(texts_path):
+            with open(texts_path, encoding='utf-8') as f:
+                texts = json.load(f)
+        texts.update({text_key(t): t for t in df[args.column].fillna('').astype(str)})
+        with open(texts_path, 'w', encoding='utf-8') as f:
+            json.dump(texts, f, ensure_ascii=False)
+        print(f"{args.store}: {len(store):,} texts")
+    if args.ivf:
+        start = time.perf_counter()
+        IVFIndex.build(store.embeddings, args.ivf).save(ivf_path)
+        print(f"IVF index with {args.ivf} cells built in {time.perf_counter() - start:.1f}s")
+    if args.similar:
+        texts_path = os.path.join(args.store, 'texts.json')
+        texts = {}
+        if os.path.exists(texts_path):
+            with open(texts_path, encoding='utf-8') as f:
+                texts = json.load(f)
+        keys = store.meta['keys']
+        queries, _ = encode(args.similar)
+        ivf = IVFIndex.load(ivf_path) if os.path.exists(ivf_path) else None
+        if ivf is not None and ivf.rows != len(store):
+            print(f"IVF index covers {ivf.rows:,} of {len(store):,} rows; using brute force (rebuild with --ivf)")
+            ivf = None
+        if ivf is not None:
+            ids, sims = ivf.search(store.embeddings, queries, args.k)
+        else:
+            ids, sims = search(store.embeddings, queries, args.k)
+        for text, row_ids, row_sims in zip(args.similar, ids, sims):
+            print(f"\n{text!r}")
+            for i, s in zip(row_ids, row_sims):
+                if i >= 0:
+                    print(f"  {s:.3f}  {texts.get(keys[i], keys[i])}")
+    if args.heads:
+        print(head_report(args.heads, store))
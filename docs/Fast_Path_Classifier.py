@@ -0,0 +1,224 @@
+import argparse
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# === CONFIGURATION ===
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(HERE, 'fast_path_model.npz')
+
+N_FEATURES = 2 ** 18   # hashed feature buckets
+THRESHOLD = 0.9        # fast-path probability needed to skip BERT
+NUM_LABELS = 6         # same label ids as the BERT model ('Label' column of the dataset)
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+# === FEATURES ===
+def _features(text):
+    """Word unigrams, word bigrams and character 3-grams of each word."""
+    tokens = _TOKEN.findall(str(text).lower())
+    for tok in tokens:
+        yield 'w:' + tok
+        padded = f'<{tok}>'
+        for i in range(len(padded) - 2):
+            yield 'c:' + padded[i:i + 3]
+    for a, b in zip(tokens, tokens[1:]):
+        yield f'b:{a} {b}'
+
+
+def featurize(texts, n_features=N_FEATURES):
+    """Signed feature hashing into an L2-normalised CSR matrix of shape (len(texts), n_features)."""
+    indptr, indices, values = [0], [], []
+    for text in texts:
+        row = {}
+        for feat in _features(text):
+            h = zlib.crc32(feat.encode('utf-8'))
+            j = h & (n_features - 1)
+            row[j] = row.get(j, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        vals = np.fromiter(row.values(), dtype=np.float32, count=len(row))
+        norm = np.linalg.norm(vals)
+        indices.extend(row.keys())
+        values.extend(vals / norm if norm else vals)
+        indptr.append(len(indices))
+    return csr_matrix((np.asarray(values, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+                       np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, n_features))
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+
+# === MODEL ===
+class FastPathModel:
+    """Multinomial logistic regression over hashed n-grams, stored as float16 weights."""
+
+    def __init__(self, weights, bias, n_features=N_FEATURES):
+        self.weights = weights
+        self.bias = bias
+        self.n_features = n_features
+
+    @classmethod
+    def train(cls, texts, labels, n_features=N_FEATURES, num_labels=NUM_LABELS,
+              epochs=5, batch_size=256, lr=0.5, l2=1e-6, seed=42):
+        """Mini-batch AdaGrad on the softmax cross-entropy."""
+        X = featurize(texts, n_features)
+        y = np.asarray(labels, dtype=np.int64)
+        W = np.zeros((n_features, num_labels), dtype=np.float32)
+        b = np.zeros(num_labels, dtype=np.float32)
+        gW = np.full_like(W, 1e-8)
+        gb = np.full_like(b, 1e-8)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            order = rng.permutation(X.shape[0])
+            loss = 0.0
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                Xb = X[idx]
+                P = _softmax(np.asarray(Xb @ W) + b)
+                loss -= np.log(P[np.arange(len(idx)), y[idx]] + 1e-12).sum()
+                P[np.arange(len(idx)), y[idx]] -= 1
+                P /= len(idx)
+
+                cols = np.unique(Xb.indices)   # only buckets present in the batch move
+                grad = np.asarray(Xb[:, cols].T @ P) + l2 * W[cols]
+                gW[cols] += grad ** 2
+                W[cols] -= lr * grad / np.sqrt(gW[cols])
+                grad_b = P.sum(axis=0)
+                gb += grad_b ** 2
+                b -= lr * grad_b / np.sqrt(gb)
+            print(f"  epoch {epoch + 1}/{epochs}: loss {loss / len(order):.4f}")
+
+        return cls(W.astype(np.float16), b, n_features)
+
+    def save(self, path=MODEL_PATH):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, n_features=self.n_features)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        data = np.load(path)
+        return cls(data['weights'], data['bias'], int(data['n_features']))
+
+    def predict_proba(self, texts):
+        X = featurize(texts, self.n_features)
+        return _softmax(np.asarray(X @ self.weights, dtype=np.float32) + self.bias)
+
+    def predict(self, texts):
+        """(pred_idx, confidence) arrays, matching the BERT layer's argmax/max."""
+        probs = self.predict_proba(texts)
+        return probs.argmax(axis=1), probs.max(axis=1)
+
+
+_model = None
+
+
+def load_model(path=MODEL_PATH):
+    """The shipped fast-path model, or None when it has not been trained yet."""
+    global _model
+    if _model is None and os.path.exists(path):
+        _model = FastPathModel.load(path)
+    return _model
+
+
+# === DATA (same preparation as AI_Classifier_for_Tree_Grower_Extension.ipynb) ===
+def load_splits(dataset_path):
+    """Shuffle, upsample every category to the 'Normal' count, then split 1/2, 1/4, 1/4.
+
+    The notebook casts Comment to str before its dropna, so NaN comments stay in every split
+    as the string 'nan'; they are kept the same way here so the splits are BERT's. (str() per
+    value: pandas 3's astype(str) leaves NaN missing.)
+    """
+    import pandas as pd
+    from sklearn.utils import resample
+
+    df = pd.read_csv(dataset_path, encoding='utf-8')
+    df = df.sample(frac=1.0, random_state=42)
+    df_majority = df[df['Category'] == 'Normal']
+    parts = [df_majority] + [
+        resample(df[df['Category'] == cat], replace=True, n_samples=len(df_majority), random_state=123)
+        for cat in ['Trolling', 'Profanity', 'Derogatory', 'Hate Speech', 'Microaggression']
+    ]
+    df_balanced = pd.concat(parts).sample(frac=1, random_state=42).reset_index(drop=True)
+
+    SIZE = df_balanced.shape[0]
+    splits = []
+    for part in (df_balanced[:SIZE//2], df_balanced[SIZE//2:3*SIZE//4], df_balanced[3*SIZE//4:]):
+        part = part.copy()
+        part['Comment'] = part['Comment'].map(str)
+        splits.append(part)
+    return tuple(splits)
+
+
+# === REPORT ===
+def report(dataset_path, thresholds=(0.7, 0.8, 0.9, 0.95, 0.99), limit=None):
+    """Escalation rate, throughput and agreement with BERT-only labels on the test split."""
+    import Integrated_testing_logic as classifier
+
+    _, _, test_df = load_splits(dataset_path)
+    if limit:
+        test_df = test_df[:limit]
+    texts = test_df['Comment'].tolist()
+    gold = test_df['Label'].to_numpy()
+    model = load_model()
+    if model is None:
+        raise FileNotFoundError(f"{MODEL_PATH} not found; train the fast path first (--train)")
+
+    start = time.perf_counter()
+    fast_pred, fast_conf = model.predict(texts)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bert_pred, _ = classifier.bert_predict(texts)
+    bert_time = time.perf_counter() - start
+    bert_rate = len(texts) / bert_time
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append("SPARSE LINEAR FAST PATH REPORT (test split)")
+    lines.append("=" * 80)
+    lines.append(f"  • Test comments: {len(texts):,}")
+    lines.append(f"  • Fast path alone: {len(texts) / fast_time:,.0f} comments/s, "
+                 f"accuracy {np.mean(fast_pred == gold) * 100:.1f}%")
+    lines.append(f"  • BERT alone: {bert_rate:,.1f} comments/s, accuracy {np.mean(bert_pred == gold) * 100:.1f}%")
+    lines.append("")
+    lines.append(f"  {'threshold':>9} {'escalated':>10} {'agree w/ BERT':>14} {'accuracy':>9} {'comments/s':>11} {'speed-up':>9}")
+    for t in thresholds:
+        resolved = fast_conf >= t
+        cascade = np.where(resolved, fast_pred, bert_pred)
+        escalated = ~resolved
+        # BERT cost of the escalated comments is measured, not extrapolated
+        start = time.perf_counter()
+        if escalated.any():
+            classifier.bert_predict([x for x, e in zip(texts, escalated) if e])
+        total = fast_time + time.perf_counter() - start
+        lines.append(f"  {t:>9.2f} {escalated.mean() * 100:>9.1f}% {np.mean(cascade == bert_pred) * 100:>13.1f}% "
+                     f"{np.mean(cascade == gold) * 100:>8.1f}% {len(texts) / total:>11,.1f} {bert_time / total:>8.1f}x")
+    lines.append("=" * 80)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Hashed n-gram logistic regression fast path ahead of BERT')
+    parser.add_argument('dataset', help='Trawling for Trolling Dataset.csv')
+    parser.add_argument('--train', action='store_true', help=f'train on the train split and save {os.path.basename(MODEL_PATH)}')
+    parser.add_argument('--report', action='store_true', help='compare the cascade against BERT on the test split')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--limit', type=int, default=None, help='only report on the first N test comments')
+    args = parser.parse_args()
+
+    if args.train:
+        train_df, val_df, _ = load_splits(args.dataset)
+        model = FastPathModel.train(train_df['Comment'].tolist(), train_df['Label'].tolist(), epochs=args.epochs)
+        model.save()
+        pred, _ = model.predict(val_df['Comment'].tolist())
+        print(f"Validation accuracy: {np.mean(pred == val_df['Label'].to_numpy()) * 100:.1f}%")
+        print(f"Saved {MODEL_PATH} ({os.path.getsize(MODEL_PATH) / 1024:.0f} KB)")
+    if args.report:
+        print(report(args.dataset, limit=args.limit))
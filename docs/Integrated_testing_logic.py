@@ -2,12 +2,22 @@ import torch
 import re
 from transformers import BertTokenizer, BertForSequenceClassification
 
-# 1. SETUP: Load the BERT
+import Fast_Path_Classifier
+from Language_ID import is_off_target
+
+# 1. SETUP: Load the BERT (on first use, so the cheap layers can be imported without it)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 model_path = "dbmdz/bert-base-turkish-uncased" 
-tokenizer = BertTokenizer.from_pretrained(model_path)
-model = BertForSequenceClassification.from_pretrained(model_path, num_labels=6).to(device)
-model.eval()
+tokenizer = None
+model = None
+
+def load_model():
+    global tokenizer, model
+    if model is None:
+        tokenizer = BertTokenizer.from_pretrained(model_path)
+        model = BertForSequenceClassification.from_pretrained(model_path, num_labels=6).to(device)
+        model.eval()
+    return tokenizer, model
 
 # 2. OFFICIAL KEYWORD LISTS (Priority Order)
 CATEGORIES = {
@@ -19,9 +29,17 @@ CATEGORIES = {
     "POSITIVE": ['great','awesome','love','amazing','wonderful','excellent','fantastic','good','nice','beautiful','helpful','thanks','thank you','appreciate','well done','brilliant','perfect','agree','support','insightful','interesting','cool','respect']
 }
 
-def get_tree_update_final(text):
+# Optional Drift_Monitor.DriftMonitor; every decision is recorded when set
+monitor = None
+
+# Optional Model_Registry.ModelRegistry; when set, Layer 2 runs on the checkpoint it routes to
+registry = None
+
+NEUTRAL_FALLBACK = {"Sentiment": "Neutral", "Category": "OOD_FALLBACK", "Drops": "+2 Water 💧", "Score": +2}
+
+def keyword_layer(text):
     text_lower = text.lower()
-    
+
     # --- LAYER 1: PRIORITY KEYWORD FILTER (Deterministic) ---
     # Rule: Keyword match always overrides AI
     for cat_name in ["HATE_SPEECH", "DEROGATORY", "MICROAGGRESSION", "PROFANITY", "TROLLING"]:
@@ -31,21 +49,28 @@ def get_tree_update_final(text):
     if any(re.search(rf"\b{re.escape(word)}\b", text_lower) for word in CATEGORIES["POSITIVE"]):
         return {"Sentiment": "Positive", "Category": "POSITIVE_KEYWORD", "Drops": "+3 Water 💧", "Score": +3}
 
-    # --- LAYER 2: AI SEMANTIC CLASSIFICATION ---
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=128).to(device)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        conf, pred_idx = torch.max(probs, dim=-1)
-    
-    conf = conf.item()
-    pred_idx = pred_idx.item()
+    return None
 
+def bert_predict(texts, batch_size=32):
+    """Batched Layer 2: (pred_idx, conf) lists for `texts`."""
+    tokenizer, model = load_model()
+    preds, confs = [], []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[start:start + batch_size], return_tensors="pt", truncation=True, padding=True, max_length=128).to(device)
+        with torch.no_grad():
+            outputs = model(**inputs)
+            probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            conf, pred_idx = torch.max(probs, dim=-1)
+        preds.extend(pred_idx.tolist())
+        confs.extend(conf.tolist())
+    return preds, confs
+
+def model_result(pred_idx, conf):
     # --- LAYER 3: THE "NEUTRAL" LINGUISTIC BUFFER ---
     # Logic: If confidence is low (other languages/Unclear), award Neutral (+2)
     # This explains why Neutral comments existed in your study results.
     if conf < 0.55: 
-        return {"Sentiment": "Neutral", "Category": "OOD_FALLBACK", "Drops": "+2 Water 💧", "Score": +2}
+        return dict(NEUTRAL_FALLBACK)
 
     if pred_idx == 0:
         return {"Sentiment": "Positive", "Category": "AI_NORMAL", "Drops": "+3 Water 💧", "Score": +3}
@@ -53,14 +78,62 @@ def get_tree_update_final(text):
         label_map = {1: "TROLLING", 2: "PROFANITY", 3: "DEROGATORY", 4: "HATE_SPEECH", 5: "MICROAGGRESSION"}
         return {"Sentiment": "Negative", "Category": label_map.get(pred_idx, "TOXIC"), "Drops": "+3 Poison ☠️", "Score": -3}
 
+def get_tree_update_final(text, language_filter=True, fast_path_threshold=Fast_Path_Classifier.THRESHOLD, model_name=None):
+    result, layer, conf = classify(text, language_filter, fast_path_threshold, model_name)
+    if monitor is not None:
+        monitor.record(layer, result["Category"], result["Sentiment"], conf)
+    return result
+
+def classify(text, language_filter=True, fast_path_threshold=Fast_Path_Classifier.THRESHOLD, model_name=None):
+    """get_tree_update_final plus the deciding layer and model confidence (None for rules).
+
+    With a `registry`, Layer 2 uses `model_name`, or the registry's A/B split keyed on the text.
+    """
+    keyword_result = keyword_layer(text)
+    if keyword_result is not None:
+        return keyword_result, "keyword", None
+
+    # --- LANGUAGE PRE-FILTER: CHARACTER N-GRAM LANGUAGE ID ---
+    # Logic: confidently non-English comments land below the 0.55 threshold in Layer 3
+    # anyway, so award Neutral (+2) without paying for the BERT forward pass.
+    if language_filter and is_off_target(text):
+        return dict(NEUTRAL_FALLBACK), "language_filter", None
+
+    # --- LAYER 1.5: SPARSE LINEAR FAST PATH ---
+    # Logic: hashed n-gram logistic regression resolves the easy comments; only those
+    # below `fast_path_threshold` escalate to BERT. Pass None to disable.
+    fast_path = Fast_Path_Classifier.load_model()
+    if fast_path is not None and fast_path_threshold is not None:
+        pred_idx, conf = fast_path.predict([text])
+        if conf[0] >= fast_path_threshold:
+            return model_result(int(pred_idx[0]), float(conf[0])), "fast_path", float(conf[0])
+
+    # --- LAYER 2: AI SEMANTIC CLASSIFICATION ---
+    if registry is not None:
+        _, preds, confs = registry.predict([text], name=model_name, key=text)
+        return model_result(preds[0], confs[0]), "bert", confs[0]
+
+    tokenizer, model = load_model()
+    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=128).to(device)
+    with torch.no_grad():
+        outputs = model(**inputs)
+        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        conf, pred_idx = torch.max(probs, dim=-1)
+    
+    conf = conf.item()
+    pred_idx = pred_idx.item()
+
+    return model_result(pred_idx, conf), "bert", conf
+
 # --- VALIDATION TEST ---
-test_data = [
-    "This is a great and insightful post!", 
-    "You are a total loser.",               
-    "Esta es una buena idea",                
-    "lol cope harder"                        
-]
-
-for comment in test_data:
-    res = get_tree_update_final(comment)
-    print(f"Comment: {comment}\nResult: {res['Sentiment']} ({res['Category']}) -> {res['Drops']}\n")
+if __name__ == "__main__":
+    test_data = [
+        "This is a great and insightful post!", 
+        "You are a total loser.",               
+        "Esta es una buena idea",                
+        "lol cope harder"                        
+    ]
+
+    for comment in test_data:
+        res = get_tree_update_final(comment)
+        print(f"Comment: {comment}\nResult: {res['Sentiment']} ({res['Category']}) -> {res['Drops']}\n")
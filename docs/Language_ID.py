@@ -0,0 +1,171 @@
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+# === CONFIGURATION ===
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED_PATH = os.path.join(HERE, 'language_id_seed.tsv')
+TABLE_PATH = os.path.join(HERE, 'language_id_table.json')
+
+NGRAM_ORDERS = (1, 2, 3)
+TOP_K = 300          # n-grams kept per language in the shipped table
+TARGET = 'en'        # language the BERT model was trained on
+THRESHOLD = 0.99     # posterior needed before a comment skips BERT
+MIN_LETTERS = 15     # shorter comments are too ambiguous to call
+
+_NOISE = re.compile(r"https?://\S+|[@#]\w+|[\d_]+")
+_NON_LETTER = re.compile(r"[^\w\s']|\d|_")
+
+
+# === FEATURES ===
+def normalize(text):
+    """Lowercase and keep only words: drops URLs, @mentions, #hashtags, digits and emoji."""
+    text = _NOISE.sub(' ', str(text).lower())
+    text = _NON_LETTER.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def ngrams(text, orders=NGRAM_ORDERS):
+    for word in normalize(text).split():
+        padded = f' {word} '
+        for n in orders:
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram.strip():
+                    yield gram
+
+
+# === TRAINING (offline) ===
+def train(corpus_path=SEED_PATH, top_k=TOP_K, orders=NGRAM_ORDERS):
+    """Build the n-gram table from a `lang<TAB>sentence` corpus.
+
+    Each language keeps its `top_k` most frequent n-grams as add-one smoothed log
+    probabilities; everything else falls back to that language's `unseen` score.
+    """
+    counts = defaultdict(Counter)
+    with open(corpus_path, encoding='utf-8') as f:
+        for line in f:
+            if '\t' not in line:
+                continue
+            lang, sentence = line.rstrip('\n').split('\t', 1)
+            counts[lang].update(ngrams(sentence, orders))
+
+    vocab = set().union(*counts.values())
+    langs = {}
+    for lang, counter in counts.items():
+        total = sum(counter.values()) + len(vocab)
+        langs[lang] = {
+            'unseen': round(math.log(1 / total), 3),
+            'ngrams': {g: round(math.log((c + 1) / total), 3) for g, c in counter.most_common(top_k)},
+        }
+    return {'orders': list(orders), 'langs': langs}
+
+
+def save_table(table, path=TABLE_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+_tables = {}
+
+
+def load_table(path=TABLE_PATH):
+    if path not in _tables:
+        with open(path, encoding='utf-8') as f:
+            _tables[path] = json.load(f)
+    return _tables[path]
+
+
+# === INFERENCE ===
+def identify(text, table=None):
+    """Return (language, posterior, letters) for `text` under the naive-Bayes n-gram table."""
+    table = table or load_table()
+    grams = list(ngrams(text, table['orders']))
+    letters = sum(1 for g in grams if len(g) == 1)
+    if not grams:
+        return None, 0.0, 0
+
+    scores = {}
+    for lang, model in table['langs'].items():
+        seen, unseen = model['ngrams'], model['unseen']
+        scores[lang] = sum(seen.get(g, unseen) for g in grams)
+
+    best = max(scores, key=scores.get)
+    norm = sum(math.exp(s - scores[best]) for s in scores.values())
+    return best, 1 / norm, letters
+
+
+def is_off_target(text, target=TARGET, threshold=THRESHOLD, min_letters=MIN_LETTERS, table=None):
+    """True when `text` is confidently written in a language other than `target`."""
+    lang, posterior, letters = identify(text, table)
+    return lang is not None and lang != target and posterior >= threshold and letters >= min_letters
+
+
+# === REPORT ===
+def report(comments_path, with_model=False, threshold=THRESHOLD, min_letters=MIN_LETTERS):
+    """How much Layer 2 traffic the pre-filter removes on `comments_path`, and how often
+    the comments it routes were Neutral in the deployment (and, with the model, under BERT)."""
+    import pandas as pd
+    import Integrated_testing_logic as classifier
+
+    df = pd.read_csv(comments_path)
+    texts = df['comment_text'].fillna('').astype(str)
+    reaches_bert = texts.map(lambda t: classifier.keyword_layer(t) is None)
+    ids = texts.map(identify)
+    routed = reaches_bert & texts.map(lambda t: is_off_target(t, threshold=threshold, min_letters=min_letters))
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append("LANGUAGE-ID PRE-FILTER REPORT")
+    lines.append("=" * 80)
+    lines.append(f"  • Comments: {len(df):,}")
+    lines.append(f"  • Reaching BERT without the filter: {reaches_bert.sum():,}")
+    lines.append(f"  • Routed to Neutral by the filter: {routed.sum():,} "
+                 f"({routed.sum() / max(reaches_bert.sum(), 1) * 100:.1f}% of BERT traffic removed)")
+    lines.append(f"  • Threshold: {threshold}, minimum letters: {min_letters}")
+
+    langs = Counter(lang for (lang, _, _), r in zip(ids, routed) if r)
+    lines.append("\nRouted comments by detected language:")
+    for lang, n in langs.most_common():
+        lines.append(f"  • {lang}: {n}")
+
+    deployed = df.loc[routed, 'sentiment'].str.strip().str.lower()
+    lines.append(f"\nAgreement with deployed labels (Neutral): "
+                 f"{(deployed == 'neutral').mean() * 100 if len(deployed) else 0:.1f}%")
+    for sentiment, n in deployed.value_counts().items():
+        lines.append(f"  • deployed {sentiment}: {n}")
+
+    if with_model:
+        current = texts[routed].map(lambda t: classifier.get_tree_update_final(t, language_filter=False))
+        same = current.map(lambda r: r['Category'] == 'OOD_FALLBACK')
+        lines.append(f"\nAgreement with get_tree_update_final without the filter: "
+                     f"{same.mean() * 100 if len(same) else 0:.1f}%")
+        for category, n in current.map(lambda r: r['Category']).value_counts().items():
+            lines.append(f"  • {category}: {n}")
+
+    lines.append("=" * 80)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Character n-gram language ID ahead of BERT')
+    parser.add_argument('--train', action='store_true', help=f'rebuild {os.path.basename(TABLE_PATH)} from the seed corpus')
+    parser.add_argument('--report', metavar='CSV', help='report on a comments export, e.g. comments_rows.csv')
+    parser.add_argument('--with-model', action='store_true', help='also compare against the BERT path')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--min-letters', type=int, default=MIN_LETTERS)
+    parser.add_argument('text', nargs='*')
+    args = parser.parse_args()
+
+    if args.train:
+        save_table(train())
+        print(f"Saved {TABLE_PATH} ({os.path.getsize(TABLE_PATH) / 1024:.0f} KB)")
+    if args.report:
+        print(report(args.report, args.with_model, args.threshold, args.min_letters))
+    for text in args.text:
+        lang, posterior, letters = identify(text)
+        print(f"{text!r}: {lang} ({posterior:.3f}, {letters} letters) -> "
+              f"{'skip BERT' if is_off_target(text, threshold=args.threshold, min_letters=args.min_letters) else 'BERT'}")
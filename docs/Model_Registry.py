@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# === CONFIGURATION ===
+MEMORY_BUDGET_MB = 2048    # resident weights across the warm pool
+NUM_LABELS = 6
+LATENCY_WINDOW = 1000      # most recent requests kept per model for latency percentiles
+VARIANTS = ('fp32', 'int8')
+
+
+def model_bytes(model):
+    """Bytes held by a model's weights, including dynamically quantised packed Linear weights."""
+    def size(value):
+        if hasattr(value, 'element_size'):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(size(v) for v in value)
+        return 0
+    return sum(size(v) for v in model.state_dict().values())
+
+
+# === REGISTRY ===
+class ModelRegistry:
+    """Named classifier checkpoints kept warm under a memory budget, evicted least-recently-used.
+
+    Register checkpoints with `register`, then ask for one by name or let `route` pick one
+    from the A/B `split`. Integrated_testing_logic sends its Layer 2 calls here when its
+    `registry` is set.
+    """
+
+    def __init__(self, budget_mb=MEMORY_BUDGET_MB, split=None, seed=None):
+        self.budget = budget_mb * 2 ** 20
+        self.specs = {}
+        self.pool = OrderedDict()      # name -> (tokenizer, model, bytes), least recently used first
+        self.stats = {}
+        self.split = {}
+        self.default = None
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        if split:
+            self.set_split(split)
+
+    def register(self, name, path, variant='fp32', num_labels=NUM_LABELS):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown variant {variant!r}; choose from {', '.join(VARIANTS)}")
+        self.specs[name] = {'path': path, 'variant': variant, 'num_labels': num_labels}
+        self.stats[name] = {'loads': 0, 'load_seconds': 0.0, 'requests': 0, 'hits': 0, 'evictions': 0,
+                            'bytes': None, 'latency': deque(maxlen=LATENCY_WINDOW)}
+        self.default = self.default or name
+        return self
+
+    def set_split(self, split):
+        """A/B ratios by model name, e.g. {'fp32': 0.9, 'int8': 0.1}; normalised to sum to 1."""
+        unknown = set(split) - set(self.specs)
+        if unknown:
+            raise ValueError(f"Split names unregistered model(s): {', '.join(sorted(unknown))}")
+        total = sum(split.values())
+        self.split = {name: ratio / total for name, ratio in split.items() if ratio > 0}
+
+    def route(self, key=None):
+        """Model for one request: the A/B split (sticky per `key` when given), else the default."""
+        if not self.split:
+            return self.default
+        # a key (user id, comment text) always lands in the same arm
+        u = (int(hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:8], 16) / 2 ** 32
+             if key is not None else self._rng.random())
+        for name, ratio in self.split.items():
+            u -= ratio
+            if u < 0:
+                return name
+        return name
+
+    # --- pool ---
+    def _load(self, name):
+        import torch
+        from transformers import BertTokenizer, BertForSequenceClassification
+        import Integrated_testing_logic as classifier
+
+        spec = self.specs[name]
+        start = time.perf_counter()
+        tokenizer = BertTokenizer.from_pretrained(spec['path'])
+        model = BertForSequenceClassification.from_pretrained(spec['path'], num_labels=spec['num_labels'])
+        if spec['variant'] == 'int8':
+            # dynamic int8 Linear layers run on CPU only
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        else:
+            model = model.to(classifier.device)
+        model.eval()
+        stats = self.stats[name]
+        stats['loads'] += 1
+        stats['load_seconds'] += time.perf_counter() - start
+        stats['bytes'] = model_bytes(model)
+        return tokenizer, model, stats['bytes']
+
+    def _evict(self, needed, keep=None):
+        while self.pool and self.resident_bytes() + needed > self.budget:
+            victim = next((n for n in self.pool if n != keep), None)
+            if victim is None:
+                break
+            del self.pool[victim]
+            self.stats[victim]['evictions'] += 1
+
+    def resident_bytes(self):
+        return sum(entry[2] for entry in self.pool.values())
+
+    def get(self, name=None, record=True):
+        """(tokenizer, model) for `name` (routed when None), loading and evicting as needed."""
+        with self._lock:
+            name = name or self.route()
+            if name not in self.specs:
+                raise KeyError(f"Model {name!r} is not registered")
+            stats = self.stats[name]
+            stats['requests'] += record
+            if name in self.pool:
+                stats['hits'] += record
+                self.pool.move_to_end(name)
+            else:
+                # free room up front when the size is known from an earlier load
+                self._evict(stats['bytes'] or 0)
+                self.pool[name] = self._load(name)
+                self._evict(0, keep=name)
+            tokenizer, model, _ = self.pool[name]
+            return tokenizer, model
+
+    def warm(self, names=None):
+        """Preload `names` (default: every registered model, as far as the budget allows)."""
+        for name in names or self.specs:
+            self.get(name, record=False)
+
+    # --- inference ---
+    def predict(self, texts, name=None, key=None, batch_size=32):
+        """(model name, pred_idx list, conf list) for `texts`, routed by name or by `key`."""
+        import torch
+        import Integrated_testing_logic as classifier
+
+        name = name or self.route(key)
+        tokenizer, model = self.get(name)
+        # cold loads are timed separately in load_seconds, so latency covers inference only
+        start = time.perf_counter()
+        device = classifier.device if self.specs[name]['variant'] == 'fp32' else torch.device('cpu')
+        preds, confs = [], []
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt", truncation=True, padding=True,
+                               max_length=128).to(device)
+            with torch.no_grad():
+                probs = torch.nn.functional.softmax(model(**inputs).logits, dim=-1)
+                conf, pred_idx = torch.max(probs, dim=-1)
+            preds.extend(pred_idx.tolist())
+            confs.extend(conf.tolist())
+        self.stats[name]['latency'].append(time.perf_counter() - start)
+        return name, preds, confs
+
+    # --- reporting ---
+    def summary(self):
+        """Per-model load time, hit rate, latency and residency."""
+        rows = {}
+        for name, s in self.stats.items():
+            lat = np.array(s['latency']) * 1000
+            rows[name] = {
+                'variant': self.specs[name]['variant'],
+                'resident': name in self.pool,
+                'size_mb': s['bytes'] / 2 ** 20 if s['bytes'] else None,
+                'loads': s['loads'],
+                'mean_load_s': s['load_seconds'] / s['loads'] if s['loads'] else None,
+                'requests': s['requests'],
+                'hit_rate': s['hits'] / s['requests'] if s['requests'] else None,
+                'evictions': s['evictions'],
+                'p50_ms': float(np.percentile(lat, 50)) if len(lat) else None,
+                'p95_ms': float(np.percentile(lat, 95)) if len(lat) else None,
+            }
+        return rows
+
+    def report(self):
+        def fmt(v, spec):
+            return format(v, spec) if v is not None else '-'
+
+        lines = []
+        lines.append("=" * 80)
+        lines.append("MODEL REGISTRY REPORT")
+        lines.append("=" * 80)
+        lines.append(f"  • Budget: {self.budget / 2 ** 20:,.1f} MB, resident: {self.resident_bytes() / 2 ** 20:,.1f} MB")
+        if self.split:
+            lines.append("  • Split: " + ", ".join(f"{n} {r * 100:.0f}%" for n, r in self.split.items()))
+        lines.append(f"\n  {'model':<12} {'variant':<7} {'warm':>4} {'MB':>7} {'loads':>5} {'load s':>7} "
+                     f"{'requests':>8} {'hit rate':>8} {'evicted':>7} {'p50 ms':>7} {'p95 ms':>7}")
+        for name, r in self.summary().items():
+            lines.append(f"  {name:<12} {r['variant']:<7} {'yes' if r['resident'] else 'no':>4} "
+                         f"{fmt(r['size_mb'], '7.1f'):>7} {r['loads']:>5} {fmt(r['mean_load_s'], '7.2f'):>7} "
+                         f"{r['requests']:>8} {fmt(r['hit_rate'] and r['hit_rate'] * 100, '7.1f'):>7}% "
+                         f"{r['evictions']:>7} {fmt(r['p50_ms'], '7.1f'):>7} {fmt(r['p95_ms'], '7.1f'):>7}")
+        lines.append("=" * 80)
+        return "\n".join(lines)
+
+
+def _pair(value, sep):
+    name, _, rest = value.partition(sep)
+    if not rest:
+        raise argparse.ArgumentTypeError(f"expected NAME{sep}VALUE, got {value!r}")
+    return name, rest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Route comments across several warm classifier checkpoints')
+    parser.add_argument('comments', nargs='?', default='comments_rows.csv')
+    parser.add_argument('--model', action='append', required=True, type=lambda v: _pair(v, '='),
+                        help='NAME=PATH[:int8], repeatable')
+    parser.add_argument('--split', action='append', type=lambda v: _pair(v, '='), help='NAME=RATIO, repeatable')
+    parser.add_argument('--budget-mb', type=float, default=MEMORY_BUDGET_MB)
+    parser.add_argument('--limit', type=int, default=200, help='comments to route')
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    registry = ModelRegistry(args.budget_mb)
+    for name, target in args.model:
+        path, _, variant = target.rpartition(':') if target.endswith(':int8') else (target, '', 'fp32')
+        registry.register(name, path, variant)
+    if args.split:
+        registry.set_split({name: float(ratio) for name, ratio in args.split})
+
+    texts = pd.read_csv(args.comments)['comment_text'].fillna('').astype(str).tolist()[:args.limit]
+    for text in texts:
+        registry.predict([text], key=text)
+    print(registry.report())
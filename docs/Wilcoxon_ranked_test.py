@@ -1,8 +1,8 @@
+import os
 import pandas as pd
 from scipy.stats import wilcoxon
 
-df = pd.read_csv("Post_study_report.csv")
-df.columns = df.columns.str.strip().str.replace('"', '')
+from Analysis_Pipeline import Stage, result, run
 
 # -------------  section map  ------------- each section is aggregated as shown in the Survey Form
 SEC = {
@@ -30,25 +30,56 @@ SEC = {
     ],
 }
 
-table = []
-for sec, cols in SEC.items():
-    # build one score per participant = mean of answer 
-    scores = df[cols].apply(pd.to_numeric, errors='coerce').mean(axis=1, skipna=True).dropna()
-    n  = scores.size
-    md = scores.median()
-    mn = scores.mean()
-    sd = scores.std(ddof=1)          
-
-    # one-sample Wilcoxon vs 3
-    diffs = scores - 3
-    diffs = diffs[diffs != 0]
-    if diffs.size == 0:
-        W, p = 0, 1.0
-    else:
-        stat, p = wilcoxon(diffs, zero_method='zsplit', alternative='two-sided', mode='exact')
-        W = min(stat, diffs.size*(diffs.size+1)/2 - stat)
-
-    table.append([sec, n, md, mn, sd, int(W), p])
-
-out = pd.DataFrame(table, columns=['Section','n','Median','Mean','SD','Wilcoxon_W','p'])
-print(out.to_string(index=False, float_format='%.3f'))
+
+
+def load(path="Post_study_report.csv"):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip().str.replace('"', '')
+    return df
+
+
+def aggregate(df, sections=SEC):
+    # build one score per participant = mean of answer
+    return {sec: df[cols].apply(pd.to_numeric, errors='coerce').mean(axis=1, skipna=True).dropna()
+            for sec, cols in sections.items()}
+
+
+def test(section_scores):
+    table = []
+    for sec, scores in section_scores.items():
+        n  = scores.size
+        md = scores.median()
+        mn = scores.mean()
+        sd = scores.std(ddof=1)
+
+        # one-sample Wilcoxon vs 3
+        diffs = scores - 3
+        diffs = diffs[diffs != 0]
+        if diffs.size == 0:
+            W, p = 0, 1.0
+        else:
+            stat, p = wilcoxon(diffs, zero_method='zsplit', alternative='two-sided', mode='exact')
+            W = min(stat, diffs.size*(diffs.size+1)/2 - stat)
+
+        table.append([sec, n, md, mn, sd, int(W), p])
+
+    return pd.DataFrame(table, columns=['Section','n','Median','Mean','SD','Wilcoxon_W','p'])
+
+
+def report(out):
+    return out.to_string(index=False, float_format='%.3f')
+
+
+def stages(data_dir='.', out_dir='.'):
+    path = os.path.join(data_dir, "Post_study_report.csv")
+    return [
+        Stage('wilcoxon.load', load, params={'path': path}, inputs=[path]),
+        Stage('wilcoxon.aggregate', aggregate, deps=['wilcoxon.load'], params={'sections': SEC}),
+        Stage('wilcoxon.test', test, deps=['wilcoxon.aggregate']),
+        Stage('wilcoxon.report', report, deps=['wilcoxon.test']),
+    ]
+
+
+if __name__ == "__main__":
+    results = run(stages())
+    print(result(results['wilcoxon.report']))